@@ -20,7 +20,8 @@ class DbConnector:
         uri = "mongodb://%s:%s@%s/%s" % (USER, PASSWORD, HOST, DATABASE)
         # Connect to the databases
         try:
-            self.client = MongoClient(uri)
+            # wire compression for the bulk loads (zstd needs the zstandard package, zlib is built in)
+            self.client = MongoClient(uri, compressors="zstd,zlib", zlibCompressionLevel=3)
             self.db = self.client[DATABASE]
         except Exception as e:
             print("ERROR: Failed to connect to db:", e)
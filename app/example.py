@@ -1,5 +1,7 @@
 from pprint import pprint
+from pymongo import InsertOne
 from pymongo.errors import CollectionInvalid
+from pymongo.write_concern import WriteConcern
 from DbConnector import DbConnector
 
 class ExampleProgram:
@@ -38,8 +40,9 @@ class ExampleProgram:
             },
             {"_id": 3, "name": "Bobby"}
         ]
-        collection = self.db[collection_name]
-        collection.insert_many(docs)
+        # Unordered, unacknowledged (w=0) bulk write: no per-batch round-trip wait
+        collection = self.db.get_collection(collection_name, write_concern=WriteConcern(w=0))
+        collection.bulk_write([InsertOne(d) for d in docs], ordered=False)
         print(f"Inserted {len(docs)} docs into '{collection_name}'")
 
     def fetch_documents(self, collection_name: str):
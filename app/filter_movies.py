@@ -1,15 +1,47 @@
 import os
 import csv
-import json
 import argparse
-from collections import Counter, defaultdict
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from pyarrow import csv as pacsv
+from simdjson import Parser
 
-CHUNK_SIZE = 100_000
+CHUNK_BYTES = 64 << 20  # pyarrow block size for streamed (chunked) reads
 # --- MAX RUNTIME ---
 MAX_RUNTIME = 873  # Resan (The Journey) https://en.wikipedia.org/wiki/List_of_longest_films
 
+# Same NA tokens pandas.read_csv treats as missing by default
+NA_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+             "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+
+LINKS_ID_COLUMNS = ["movieId", "imdbId", "tmdbId"]
+RATINGS_COLUMNS = ["userId", "movieId", "rating", "timestamp"]
+# Columns kept from movies_metadata.csv (what insertion.py and the notebooks use);
+# homepage, poster_path, imdb_id, adult and video are never read.
+KEEP_MOVIES = {"id", "title", "original_title", "overview", "tagline", "release_date", "budget", "revenue",
+               "runtime", "vote_average", "vote_count", "popularity", "genres", "production_companies",
+               "production_countries", "spoken_languages", "belongs_to_collection", "original_language", "status"}
+MOVIES_CATEGORICAL = ["original_language", "status", "genres", "production_companies",
+                      "production_countries", "spoken_languages"]
+# Drop reasons for clean_movies, in rule order (each row is counted under the first rule it fails)
+MOVIES_DROP_REASONS = ["id_non_numeric", "title_null", "dupes_intra", "dupes_inter", "runtime_too_long",
+                       "vote_average_out_of_range", "low_votes", "release_date_nat", "year_out_of_bounds"]
+DROP = {name: code for code, name in enumerate(MOVIES_DROP_REASONS)}
+MOVIES_NUMERIC = ["budget", "revenue", "runtime", "vote_average", "vote_count", "popularity"]
+NUMERIC_RE = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+MAX_EPOCH_S = np.iinfo(np.int64).max // 10**9  # largest epoch second representable as datetime64[ns]
+
+# One simdjson parser per process (reused across cells)
+_JSON_PARSER = Parser()
+_SQ_TO_DQ = str.maketrans("'", '"')
+
 # -----------------------------
 # Helpers
 # -----------------------------
@@ -17,6 +49,153 @@ def ensure_dir(path: str):
     os.makedirs(path, exist_ok=True)
 
 
+def csv_options(path_in: str, dtypes=None, usecols=None):
+    """pyarrow read/parse/convert options for path_in.
+    Columns not listed in dtypes are read as nullable strings (no type guessing across blocks);
+    if usecols is given, only those columns (when present) are parsed."""
+    with open(path_in, encoding="utf-8", newline="") as f:
+        header = next(csv.reader(f))
+    column_types = {col: pa.string() for col in header}
+    column_types.update(dtypes or {})
+    include = [col for col in header if col in usecols] if usecols else []
+    return dict(
+        read_options=pacsv.ReadOptions(block_size=CHUNK_BYTES),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(column_types=column_types, null_values=NA_VALUES,
+                                             strings_can_be_null=True, include_columns=include),
+    )
+
+
+def read_csv_arrow(path_in: str, dtypes=None, usecols=None) -> pd.DataFrame:
+    """Multithreaded pyarrow CSV read of the whole file."""
+    return pacsv.read_csv(path_in, **csv_options(path_in, dtypes, usecols)).to_pandas()
+
+
+def iter_csv_batches(path_in: str, dtypes=None, usecols=None):
+    """Stream path_in as pyarrow RecordBatches (~CHUNK_BYTES each)."""
+    reader = pacsv.open_csv(path_in, **csv_options(path_in, dtypes, usecols))
+    while True:
+        try:
+            yield reader.read_next_batch()
+        except StopIteration:
+            return
+
+
+def drop_rows(keep: np.ndarray, reason: np.ndarray, code: int, bad: np.ndarray):
+    """Drop rows still kept that fail a rule: record `code` as their reason and clear keep in place."""
+    hit = bad & keep
+    reason[hit] = code
+    keep[hit] = False
+
+
+def cast_numeric(batch: pa.RecordBatch, cols) -> pa.RecordBatch:
+    """Cast string columns to float64 inside Arrow; non-numeric values become null
+    (same result as pd.to_numeric(errors="coerce"), without a pandas Series per column)."""
+    arrays = []
+    for name, arr in zip(batch.schema.names, batch.columns):
+        if name in cols and pa.types.is_string(arr.type):
+            arr = pc.utf8_trim_whitespace(arr)
+            arr = pc.cast(pc.if_else(pc.match_substring_regex(arr, NUMERIC_RE), arr, None), pa.float64())
+        arrays.append(arr)
+    return pa.RecordBatch.from_arrays(arrays, names=batch.schema.names)
+
+
+def to_int64(series: pd.Series) -> pd.Series:
+    """pd.to_numeric(errors="coerce") as nullable Int64; fractions are truncated (like astype(int))
+    and non-numeric or non-finite values become <NA>."""
+    num = pd.to_numeric(series, errors="coerce")
+    return np.trunc(num.where(np.isfinite(num))).astype("Int64")
+
+
+class ChunkWriter:
+    """Append pandas chunks to path_out through one pyarrow writer (single open, header once).
+    Writes Parquet (zstd, dictionary-encoded) when path_out ends in .parquet, CSV otherwise.
+    The schema is fixed by the first chunk (all-null columns become strings, categoricals stay
+    dictionary-encoded in Parquet and are decoded for CSV); `types` overrides column types on
+    write, e.g. {"timestamp": pa.timestamp("s")}."""
+
+    def __init__(self, path_out: str, types=None):
+        self.path_out = path_out
+        self.types = types or {}
+        self.schema = None
+        self.sink = None
+        self.writer = None
+
+    def write(self, df: pd.DataFrame):
+        self.write_table(pa.Table.from_pandas(df, preserve_index=False))
+
+    def write_table(self, table: pa.Table):
+        if self.writer is None:
+            parquet = self.path_out.endswith(".parquet")
+            fields = []
+            for field in table.schema.remove_metadata():
+                ftype = self.types.get(field.name, field.type)
+                if pa.types.is_dictionary(ftype):
+                    values = pa.string() if pa.types.is_null(ftype.value_type) else ftype.value_type
+                    ftype = pa.dictionary(pa.int32(), values) if parquet else values
+                elif pa.types.is_null(ftype):
+                    ftype = pa.string()
+                fields.append(field.with_type(ftype))
+            self.schema = pa.schema(fields)
+            self.sink = pa.OSFile(self.path_out, "wb")
+            if parquet:
+                self.writer = pq.ParquetWriter(self.sink, self.schema, compression="zstd", use_dictionary=True)
+            else:
+                self.writer = pacsv.CSVWriter(self.sink, self.schema)
+        self.writer.write_table(table.cast(self.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.sink.close()
+
+
+def write_frame(df, path_out: str, types=None):
+    """Write a whole DataFrame (or pa.Table) in one go through ChunkWriter."""
+    writer = ChunkWriter(path_out, types)
+    if isinstance(df, pa.Table):
+        writer.write_table(df)
+    else:
+        writer.write(df)
+    writer.close()
+
+
+def filter_ratings_batch(batch: pa.RecordBatch) -> pd.DataFrame:
+    """Validate a ratings batch of string columns with one fused mask and compact once.
+    Cells are coerced like pd.to_numeric(errors="coerce") (non-numeric -> NaN), then rows need
+    finite ids, rating in [0,10] and a timestamp in datetime range; ids/timestamp truncate to int."""
+    cols = cast_numeric(batch, RATINGS_COLUMNS)
+    u, m, r, t = (cols.column(name).to_numpy(zero_copy_only=False) for name in RATINGS_COLUMNS)
+    with np.errstate(invalid="ignore"):
+        keep = (np.isfinite(u) & np.isfinite(m) & (r >= 0) & (r <= 10)
+                & (t > -MAX_EPOCH_S) & (t < MAX_EPOCH_S))
+
+    return pd.DataFrame({
+        "userId": u[keep].astype(np.int64),
+        "movieId": m[keep].astype(np.int64),
+        "rating": r[keep],
+        "timestamp": pd.to_datetime(t[keep].astype(np.int64), unit="s", cache=True),
+    })
+
+
+def pair_keys(a, b) -> np.ndarray:
+    """Pack two int32 id columns into one int64 key per row: (a << 32) | b."""
+    return (np.asarray(a, dtype=np.int64) << 32) | (np.asarray(b, dtype=np.int64) & 0xFFFFFFFF)
+
+
+def lookup_sorted(sorted_keys: np.ndarray, keys: np.ndarray):
+    """Return (positions, found): insertion positions of keys in sorted_keys and whether each is present."""
+    pos = np.searchsorted(sorted_keys, keys)
+    found = pos < len(sorted_keys)
+    found[found] = sorted_keys[pos[found]] == keys[found]
+    return pos, found
+
+
+def json_loads(s: str):
+    """Parse a JSON string with simdjson into plain Python objects."""
+    return _JSON_PARSER.parse(s.encode(), True)
+
+
 def parse_json_safe(value):
     """Return list/dict if parseable, otherwise []/None.
     Tolerates single quotes by re-encoding."""
@@ -29,17 +208,56 @@ def parse_json_safe(value):
     s = value.strip()
     if not s or s.lower() == "null":
         return []
+    if "'" in s and '"' not in s:
+        # Python-literal style ({'a': 'b'}): never valid JSON as-is, so skip the failing first parse
+        try:
+            return json_loads(s.translate(_SQ_TO_DQ))
+        except Exception:
+            return []
     try:
-        return json.loads(s)
+        return json_loads(s)
     except Exception:
         try:
-            return json.loads(s.replace("'", '"'))
+            return json_loads(s.translate(_SQ_TO_DQ))
         except Exception:
             return []
 
 
 def json_dump_if(obj):
-    return json.dumps(obj, ensure_ascii=False) if isinstance(obj, (list, dict)) else ""
+    return orjson.dumps(obj).decode() if isinstance(obj, (list, dict)) else ""
+
+
+def json_dump_values(series: pd.Series) -> list:
+    """Serialize a column of parsed lists/dicts in one comprehension (no per-row Series.apply)."""
+    dumps = orjson.dumps
+    return [dumps(v).decode() if isinstance(v, (list, dict)) else "" for v in series.to_numpy(dtype=object)]
+
+
+def canonicalize_json(value) -> str:
+    """Parse a JSON-ish cell and re-emit it as JSON in one pass ("" if not a list/dict)."""
+    return json_dump_if(parse_json_safe(value))
+
+
+def canonicalize_json_dict(value) -> str:
+    """Same as canonicalize_json but only keeps dicts (e.g. belongs_to_collection)."""
+    val = parse_json_safe(value)
+    return orjson.dumps(val).decode() if isinstance(val, dict) else ""
+
+
+def map_values(series: pd.Series, func) -> pd.Series:
+    """Element-wise map over the raw object array (no pandas per-element dispatch)."""
+    return pd.Series([func(v) for v in series.to_numpy(dtype=object)], index=series.index, dtype=object)
+
+
+def map_unique(series: pd.Series, func) -> pd.Series:
+    """Like map_values, but func runs once per distinct value (pd.factorize) and results are
+    gathered back by code. Meant for columns where the same cell repeats many times."""
+    codes, uniques = pd.factorize(series)
+    mapped = np.empty(len(uniques) + 1, dtype=object)
+    for i, value in enumerate(uniques):
+        mapped[i] = func(value)
+    mapped[-1] = func(None)  # code -1 = missing
+    return pd.Series(mapped[codes], index=series.index, dtype=object)
 
 
 # -----------------------------
@@ -50,155 +268,152 @@ def clean_movies(path_in: str, path_out: str, year_min: int, year_max: int, min_
     Clean movies_metadata.csv with chunked processing and detailed counters.
     - numeric unique id, non-null title
     - valid release_date within [year_min, year_max]
-    - numeric casts for budget/revenue/runtime/votes
+    - numeric casts for budget/revenue/runtime/votes (in Arrow, before pandas)
     - remove low-signal titles (vote_count < min_votes or vote_average == 0)
     - JSON columns parsed and re-serialized
     """
-    first_chunk = True
-    seen_ids = set()
+    log = []
+    writer = ChunkWriter(path_out, types={"release_date": pa.date32()})
+    seen_ids = pa.array([], type=pa.int64())  # ids already written (Arrow hash-set probe via is_in)
     total_in = 0
     total_keep = 0
-    drop_counters = Counter()
+    drop_counts = np.zeros(len(MOVIES_DROP_REASONS), dtype=np.int64)
 
-    for df in pd.read_csv(path_in, chunksize=CHUNK_SIZE, low_memory=False):
-        total_in += len(df)
+    for batch in iter_csv_batches(path_in, usecols=KEEP_MOVIES):
+        total_in += batch.num_rows
+        df = cast_numeric(batch, MOVIES_NUMERIC).to_pandas()
+
+        # Build one combined keep-mask; `reason` records the first rule that dropped each row
+        n = len(df)
+        keep = np.ones(n, dtype=bool)
+        reason = np.full(n, -1, dtype=np.int8)
 
         # force numeric ids
         id_num = pd.to_numeric(df["id"], errors="coerce")
-        drop_counters["movies_id_non_numeric"] += int(id_num.isna().sum())
-        df = df.loc[id_num.notna()].copy()
-        df["id"] = id_num.loc[id_num.notna()].astype(int)
+        drop_rows(keep, reason, DROP["id_non_numeric"], id_num.isna().to_numpy())
+        ids = id_num.to_numpy(dtype=np.int64, na_value=0)
 
         # title required
-        drop_counters["movies_title_null"] += int(df["title"].isna().sum())
-        df = df[df["title"].notna()]
+        drop_rows(keep, reason, DROP["title_null"], df["title"].isna().to_numpy())
 
         # drop dupes (intra+inter chunk)
-        before = len(df)
-        df = df.drop_duplicates(subset=["id"])
-        drop_counters["movies_dupes_intra"] += before - len(df)
+        bad = np.zeros(n, dtype=bool)
+        bad[keep] = pd.Series(ids[keep]).duplicated().to_numpy()
+        drop_rows(keep, reason, DROP["dupes_intra"], bad)
 
-        before = len(df)
-        df = df[~df["id"].isin(seen_ids)]
-        drop_counters["movies_dupes_inter"] += before - len(df)
-        seen_ids.update(df["id"])
+        bad = np.zeros(n, dtype=bool)
+        bad[keep] = pc.is_in(pa.array(ids[keep]), value_set=seen_ids).to_numpy(zero_copy_only=False)
+        drop_rows(keep, reason, DROP["dupes_inter"], bad)
+        seen_ids = pa.concat_arrays([seen_ids, pa.array(ids[keep])])
 
-        # numeric casts
-        for col in ["budget", "revenue", "runtime", "vote_average", "vote_count", "popularity"]:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
-                
         # runtime filters
         if "runtime" in df.columns:
             df.loc[df["runtime"] < 0, "runtime"] = pd.NA
             too_long = df["runtime"].notna() & (df["runtime"] > MAX_RUNTIME)
-            df = df[~too_long]
+            drop_rows(keep, reason, DROP["runtime_too_long"], too_long.to_numpy())
 
         # vote filters
         if "vote_average" in df.columns:
             bad_va = ~(df["vote_average"].between(0, 10) | df["vote_average"].isna())
-            drop_counters["movies_vote_average_out_of_range"] += int(bad_va.sum())
-            df = df[~bad_va]
+            drop_rows(keep, reason, DROP["vote_average_out_of_range"], bad_va.to_numpy())
 
         if "vote_count" in df.columns and min_votes > 0:
             low_votes = (df["vote_count"].fillna(0) < min_votes) | (df["vote_average"].fillna(0) == 0)
-            drop_counters["movies_low_votes"] += int(low_votes.sum())
-            df = df[~low_votes]
+            drop_rows(keep, reason, DROP["low_votes"], low_votes.to_numpy())
 
         # dates
         if "release_date" in df.columns:
-            df["release_date"] = pd.to_datetime(df["release_date"], errors="coerce")
-            bad_date = df["release_date"].isna()
-            drop_counters["movies_release_date_nat"] += int(bad_date.sum())
-            df = df[~bad_date]
+            release_date = pd.to_datetime(df["release_date"], format="%Y-%m-%d", errors="coerce", cache=True)
+            drop_rows(keep, reason, DROP["release_date_nat"], release_date.isna().to_numpy())
 
-            df["year"] = df["release_date"].dt.year
-            out_of_bounds = ~df["year"].between(year_min, year_max)
-            drop_counters["movies_year_out_of_bounds"] += int(out_of_bounds.sum())
-            df = df[~out_of_bounds]
+            year = release_date.dt.year
+            drop_rows(keep, reason, DROP["year_out_of_bounds"], ~year.between(year_min, year_max).to_numpy())
 
-        # parse JSON-like columns
+        # tally all drop reasons in one reduction
+        drop_counts += np.bincount(reason[~keep], minlength=len(MOVIES_DROP_REASONS))
+
+        # apply the combined mask once
+        df = df.loc[keep].copy()
+        df["id"] = ids[keep]
+        if "release_date" in df.columns:
+            df["release_date"] = release_date[keep]
+            df["year"] = year[keep].astype(np.int32)
+
+        # JSON-like columns: parse + re-serialize in a single pass
         list_cols = ["genres", "production_companies", "production_countries", "spoken_languages"]
         for col in list_cols:
             if col in df.columns:
-                df[col] = df[col].apply(parse_json_safe)
+                df[col] = map_unique(df[col], canonicalize_json)
 
         # belongs_to_collection dict or empty
         if "belongs_to_collection" in df.columns:
-            def parse_collection(x):
-                if x is None or (isinstance(x, float) and pd.isna(x)):
-                    return None
-                if isinstance(x, str) and x.strip().lower() in ("", "null"):
-                    return None
-                val = parse_json_safe(x)
-                return val if isinstance(val, dict) else None
-            df["belongs_to_collection"] = df["belongs_to_collection"].apply(parse_collection)
-
-        # serialize list/dict columns to JSON strings
-        for col in list_cols:
+            df["belongs_to_collection"] = map_unique(df["belongs_to_collection"], canonicalize_json_dict)
+
+        # low-cardinality strings -> category (dictionary-encoded on write)
+        for col in MOVIES_CATEGORICAL:
             if col in df.columns:
-                df[col] = df[col].apply(json_dump_if)
-        if "belongs_to_collection" in df.columns:
-            df["belongs_to_collection"] = df["belongs_to_collection"].apply(json_dump_if)
+                df[col] = df[col].astype("category")
 
         # write
-        mode = "w" if first_chunk else "a"
-        df.to_csv(path_out, index=False, header=first_chunk, mode=mode, quoting=csv.QUOTE_MINIMAL)
+        writer.write(df)
         total_keep += len(df)
-        first_chunk = False
+
+    writer.close()
 
     kept_ratio = (total_keep / total_in) if total_in else 0.0
-    print(f"[movies] in={total_in} out={total_keep} kept={kept_ratio:.2%}")
-    for k, v in drop_counters.items():
-        print(f"  drop.{k}: {v}")
+    log.append(f"[movies] in={total_in} out={total_keep} kept={kept_ratio:.2%}")
+    for name, count in zip(MOVIES_DROP_REASONS, drop_counts):
+        log.append(f"  drop.movies_{name}: {count}")
+    return log
 
 
 def clean_credits(path_in: str, path_out: str):
     """Deduplicate by id keeping the row with highest coverage (len(cast)+len(crew))."""
-    df = pd.read_csv(path_in, low_memory=False)
+    log = []
+    df = read_csv_arrow(path_in)
+    df["id"] = to_int64(df["id"])
 
     def to_list(x):
         v = parse_json_safe(x)
         return v if isinstance(v, list) else []
-    df["cast"] = df["cast"].apply(to_list)
-    df["crew"] = df["crew"].apply(to_list)
+    df["cast"] = map_values(df["cast"], to_list)
+    df["crew"] = map_values(df["crew"], to_list)
     df["coverage"] = df["cast"].str.len() + df["crew"].str.len()
 
     before = len(df)
-    df = df.sort_values(["id", "coverage"], ascending=[True, False]).drop_duplicates(subset=["id"], keep="first")
-    print(f"[credits] dedup: {before} -> {len(df)} (kept max coverage per id)")
+    # O(N) group scan instead of a full sort: first row with max coverage per id
+    df = df.loc[df.groupby("id", sort=False, dropna=False)["coverage"].idxmax()]
+    log.append(f"[credits] dedup: {before} -> {len(df)} (kept max coverage per id)")
 
-    df["cast"] = df["cast"].apply(json_dump_if)
-    df["crew"] = df["crew"].apply(json_dump_if)
-    df.to_csv(path_out, index=False, quoting=csv.QUOTE_MINIMAL)
-    print(f"[credits] rows_out={len(df)}")
+    df["cast"] = json_dump_values(df["cast"])
+    df["crew"] = json_dump_values(df["crew"])
+    write_frame(df, path_out)
+    log.append(f"[credits] rows_out={len(df)}")
+    return log
 
 
 def clean_links(path_in: str, path_out: str, keep_null_tmdb: bool):
     """Clean links.csv: coerce numeric, optionally keep rows with null tmdbId."""
-    df = pd.read_csv(path_in, low_memory=False)
-    for col in ["movieId", "imdbId", "tmdbId"]:
+    log = []
+    df = read_csv_arrow(path_in)  # strings: a malformed cell becomes <NA> below instead of failing the read
+    for col in LINKS_ID_COLUMNS:
         if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+            df[col] = to_int64(df[col])
 
     if not keep_null_tmdb:
         dropped = int(df["tmdbId"].isna().sum())
         df = df.dropna(subset=["movieId", "imdbId", "tmdbId"])
-        print(f"[links] dropped rows with null tmdbId: {dropped}")
+        log.append(f"[links] dropped rows with null tmdbId: {dropped}")
     else:
         df = df.dropna(subset=["movieId", "imdbId"])
 
-    df["movieId"] = df["movieId"].astype(int)
-    df["imdbId"] = df["imdbId"].astype(int)
-    if df["tmdbId"].notna().any():
-        df.loc[df["tmdbId"].notna(), "tmdbId"] = df.loc[df["tmdbId"].notna(), "tmdbId"].astype(int)
-
     before = len(df)
     df = df.drop_duplicates(subset=["movieId"])
-    print(f"[links] drop dup movieId: {before} -> {len(df)}")
+    log.append(f"[links] drop dup movieId: {before} -> {len(df)}")
 
-    df.to_csv(path_out, index=False, quoting=csv.QUOTE_MINIMAL)
-    print(f"[links] rows_out={len(df)}")
+    write_frame(df, path_out)
+    log.append(f"[links] rows_out={len(df)}")
+    return log
 
 
 def clean_ratings(path_in: str, path_out: str, keep: str = "last"):
@@ -209,120 +424,129 @@ def clean_ratings(path_in: str, path_out: str, keep: str = "last"):
     - timestamp to ISO
     - dedupe per (userId, movieId) keeping first/last; or keep='all' (no dedupe)
     """
+    log = []
     assert keep in {"first", "last", "all"}
 
     # We'll stream chunks, normalize types, and append.
     # If dedup needed, we can dedupe per-chunk and then a second pass on the combined file
     # (but that may still be large). Practical approach: keep='last' per user/movie within chunk,
     # and accept minimal residual dupes across chunk boundaries, or post-dedupe with groupby.
-    first_chunk = True
+    writer = ChunkWriter(path_out, types={"timestamp": pa.timestamp("s")})
     stats = Counter()
 
-    # Temporary store for optional global dedupe (small memory: keys only)
-    latest_ts = defaultdict(int) if keep in {"first", "last"} else None
+    # Global dedupe index across chunks: sorted (userId, movieId) keys + best timestamp (ns)
+    seen_keys = np.empty(0, dtype=np.int64)
+    seen_ts = np.empty(0, dtype=np.int64)
 
-    for df in pd.read_csv(path_in, chunksize=CHUNK_SIZE, low_memory=False):
-        stats["in_rows"] += len(df)
-        for col in ["userId", "movieId"]:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-        df["rating"] = pd.to_numeric(df["rating"], errors="coerce")
-        df = df[df["rating"].between(0, 10)]
-
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s", errors="coerce")
-        df = df[df["timestamp"].notna()]
-
-        df = df.dropna(subset=["userId", "movieId"])
-        df["userId"] = df["userId"].astype(int)
-        df["movieId"] = df["movieId"].astype(int)
+    for batch in iter_csv_batches(path_in, usecols=RATINGS_COLUMNS):
+        stats["in_rows"] += batch.num_rows
+        df = filter_ratings_batch(batch)
 
         if keep != "all":
-            # within-chunk dedupe
-            df = df.sort_values(["userId", "movieId", "timestamp"])
+            # within-chunk dedupe: lexsort by (key, timestamp), keep first/last row of each key run
+            keys = pair_keys(df["userId"].to_numpy(), df["movieId"].to_numpy())
+            ts = df["timestamp"].values.view("i8")  # datetime64[ns] -> int64 ns, zero-copy
+            order = np.lexsort((ts, keys))
+            keys, ts = keys[order], ts[order]
+            pick = np.ones(len(keys), dtype=bool)
             if keep == "last":
-                df = df.drop_duplicates(subset=["userId", "movieId"], keep="last")
+                pick[:-1] = keys[1:] != keys[:-1]
             else:
-                df = df.drop_duplicates(subset=["userId", "movieId"], keep="first")
-
-            # cross-chunk dedupe using latest_ts index
-            keep_mask = []
-            for r in df.itertuples(index=False):
-                key = (r.userId, r.movieId)
-                ts = int(r.timestamp.value)  # ns
-                if keep == "last":
-                    if ts >= latest_ts[key]:
-                        latest_ts[key] = ts
-                        keep_mask.append(True)
-                    else:
-                        keep_mask.append(False)
-                else:  # keep==first
-                    if key in latest_ts:
-                        keep_mask.append(False)
-                    else:
-                        latest_ts[key] = ts
-                        keep_mask.append(True)
-            df = df.loc[keep_mask]
-
-        mode = "w" if first_chunk else "a"
-        df.to_csv(path_out, index=False, header=first_chunk, mode=mode, quoting=csv.QUOTE_MINIMAL)
+                pick[1:] = keys[1:] != keys[:-1]
+            df = df.iloc[order[pick]]
+            keys, ts = keys[pick], ts[pick]
+
+            # cross-chunk dedupe: vectorized probe of the sorted key index
+            pos, found = lookup_sorted(seen_keys, keys)
+            keep_mask = ~found
+            if keep == "last":
+                keep_mask[found] = ts[found] >= seen_ts[pos[found]]
+                newer = found & keep_mask
+                seen_ts[pos[newer]] = ts[newer]
+
+            new = ~found
+            order = np.argsort(keys[new], kind="stable")
+            seen_keys = np.insert(seen_keys, pos[new][order], keys[new][order])
+            seen_ts = np.insert(seen_ts, pos[new][order], ts[new][order])
+            df = df[keep_mask]
+
+        writer.write(df)
         stats["out_rows"] += len(df)
-        first_chunk = False
 
-    print(f"[ratings] in={stats['in_rows']:,} out={stats['out_rows']:,} kept={stats['out_rows']/max(1,stats['in_rows']):.2%} keep={keep}")
+    writer.close()
+
+    log.append(f"[ratings] in={stats['in_rows']:,} out={stats['out_rows']:,} kept={stats['out_rows']/max(1,stats['in_rows']):.2%} keep={keep}")
+    return log
 
 
 def clean_keywords(path_in: str, path_out: str):
     """Keywords normalized (keeps JSON list in one column)."""
-    df = pd.read_csv(path_in, low_memory=False)
-    df["id"] = pd.to_numeric(df["id"], errors="coerce")
+    log = []
+    df = read_csv_arrow(path_in)
+    df["id"] = pd.to_numeric(df["id"], errors="coerce").astype("Int64")
     drops = int(df["id"].isna().sum())
     df = df.dropna(subset=["id"]).drop_duplicates(subset=["id"])
-    df["id"] = df["id"].astype(int)
-    print(f"[keywords] drop id NaN: {drops}")
-
-    df["keywords"] = df["keywords"].apply(parse_json_safe)
-    # normalize names: lower + trim
-    def norm_list(xs):
-        out = []
-        if isinstance(xs, list):
-            for d in xs:
-                if isinstance(d, dict) and d.get("name"):
-                    name = d["name"].strip()
-                    if name:
-                        out.append({"id": d.get("id"), "name": name.lower()})
-        return out
-    df["keywords"] = df["keywords"].apply(norm_list)
-    df["keywords"] = df["keywords"].apply(json_dump_if)
-
-    df.to_csv(path_out, index=False, quoting=csv.QUOTE_MINIMAL)
-    print(f"[keywords] rows_out={len(df)} -> {path_out}")
+    log.append(f"[keywords] drop id NaN: {drops}")
+
+    df["keywords"] = map_values(df["keywords"], parse_json_safe)
+    kw = explode_keyword_names(df[["id", "keywords"]])
+
+    # regroup normalized {"id", "name"} dicts per movie (rows without keywords -> [])
+    per_movie = {movie_id: [] for movie_id in df["id"].to_numpy().tolist()}
+    for movie_id, kw_id, name in zip(kw["id"], kw["kw_id"], kw["keyword"].to_pylist()):
+        per_movie[movie_id].append({"id": kw_id, "name": name})
+    df["keywords"] = [json_dump_if(per_movie[movie_id]) for movie_id in df["id"].to_numpy().tolist()]
+
+    write_frame(df, path_out)
+    log.append(f"[keywords] rows_out={len(df)} -> {path_out}")
+    return log
+
+
+def explode_keyword_names(df: pd.DataFrame) -> dict:
+    """Explode parsed keyword lists (df: id, keywords) to one entry per keyword.
+    Names are trimmed + lowercased with Arrow string kernels; missing/empty names are dropped.
+    Returns {"id": movie ids, "kw_id": keyword ids, "keyword": pa.StringArray}."""
+    s = df.explode("keywords")
+    items = s["keywords"].to_numpy(dtype=object)
+    names = pa.array([d.get("name") if isinstance(d, dict) and isinstance(d.get("name"), str) else None
+                      for d in items], type=pa.string())
+    names = pc.utf8_lower(pc.utf8_trim_whitespace(names))
+    valid = pc.fill_null(pc.not_equal(names, ""), False)
+
+    mask = valid.to_numpy(zero_copy_only=False)
+    return {
+        "id": s["id"].to_numpy()[mask].tolist(),
+        "kw_id": [d.get("id") for d in items[mask]],
+        "keyword": names.filter(valid),
+    }
 
 
 def explode_keywords(path_in: str, path_out: str):
     """Exploded keywords (one row per movie-keyword)."""
-    src = pd.read_csv(path_in, low_memory=False)
-    src["id"] = pd.to_numeric(src["id"], errors="coerce")
+    log = []
+    src = read_csv_arrow(path_in)
+    src["id"] = pd.to_numeric(src["id"], errors="coerce").astype("Int64")
     src = src.dropna(subset=["id"])
-    src["id"] = src["id"].astype(int)
+    src["keywords"] = map_values(src["keywords"], parse_json_safe)
 
-    rows = []
-    for r in src.itertuples(index=False):
-        items = parse_json_safe(getattr(r, "keywords"))
-        if isinstance(items, list):
-            for d in items:
-                if isinstance(d, dict) and d.get("name"):
-                    name = d["name"].strip().lower()
-                    if name:
-                        rows.append({"movie_id": getattr(r, "id"), "keyword": name})
-
-    out = pd.DataFrame(rows).drop_duplicates()
-    out.to_csv(path_out, index=False, quoting=csv.QUOTE_MINIMAL)
-    print(f"[keywords_exploded] rows_out={len(out)} -> {path_out}")
+    kw = explode_keyword_names(src[["id", "keywords"]])
+    out = pa.table({"movie_id": pa.array(kw["id"], type=pa.int64()), "keyword": kw["keyword"]})
+    out = out.group_by(["movie_id", "keyword"], use_threads=False).aggregate([])  # drop_duplicates, keeps order
+    write_frame(out, path_out)
+    log.append(f"[keywords_exploded] rows_out={out.num_rows} -> {path_out}")
+    return log
 
 
 # -----------------------------
 # CLI
 # -----------------------------
+def positive_int(value: str) -> int:
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return n
+
+
 def main():
     ap = argparse.ArgumentParser(description="Clean Movies Dataset CSVs (improved, chunk-safe, with logs).")
     ap.add_argument("--in-dir", default="data", help="Input directory with original CSVs")
@@ -343,48 +567,56 @@ def main():
     # Keywords options
     ap.add_argument("--explode-keywords", action="store_true", help="Also write exploded keywords file")
 
+    # Output options
+    ap.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                    help="Output file format for cleaned files (default: csv)")
+    ap.add_argument("--workers", type=positive_int, default=5,
+                    help="Parallel worker processes, one cleaning stage each (default: 5)")
+
     args = ap.parse_args()
     ensure_dir(args.out_dir)
+    ext = "." + args.format
 
     # Paths
     p_movies_in  = os.path.join(args.in_dir,  "movies_metadata.csv")
-    p_movies_out = os.path.join(args.out_dir, "movies_metadata_clean.csv")
+    p_movies_out = os.path.join(args.out_dir, "movies_metadata_clean" + ext)
 
     p_credits_in  = os.path.join(args.in_dir,  "credits.csv")
-    p_credits_out = os.path.join(args.out_dir, "credits_clean.csv")
+    p_credits_out = os.path.join(args.out_dir, "credits_clean" + ext)
 
     p_links_in  = os.path.join(args.in_dir,  "links.csv")
-    p_links_out = os.path.join(args.out_dir, "links_clean.csv")
+    p_links_out = os.path.join(args.out_dir, "links_clean" + ext)
 
     p_ratings_in  = os.path.join(args.in_dir,  "ratings.csv")
-    p_ratings_out = os.path.join(args.out_dir, "ratings_clean.csv")
+    p_ratings_out = os.path.join(args.out_dir, "ratings_clean" + ext)
 
     p_keywords_in  = os.path.join(args.in_dir,  "keywords.csv")
-    p_keywords_out = os.path.join(args.out_dir, "keywords_clean.csv")
-    p_keywords_exp = os.path.join(args.out_dir, "keywords_exploded.csv")
-
-    # Run
-    print("[*] Cleaning movies_metadata...")
-    clean_movies(p_movies_in, p_movies_out, args.year_min, args.year_max, args.min_votes)
-
-    print("[*] Cleaning credits...")
-    clean_credits(p_credits_in, p_credits_out)
-
-    print("[*] Cleaning links...")
-    clean_links(p_links_in, p_links_out, keep_null_tmdb=args.keep_null_tmdb)
-
-    print("[*] Cleaning ratings (chunked)...")
-    clean_ratings(p_ratings_in, p_ratings_out, keep=args.ratings_keep)
-
+    p_keywords_out = os.path.join(args.out_dir, "keywords_clean" + ext)
+    p_keywords_exp = os.path.join(args.out_dir, "keywords_exploded" + ext)
+
+    # Stages read/write different files -> run them in parallel processes
+    stages = [
+        ("movies_metadata", clean_movies, (p_movies_in, p_movies_out, args.year_min, args.year_max, args.min_votes)),
+        ("credits", clean_credits, (p_credits_in, p_credits_out)),
+        ("links", clean_links, (p_links_in, p_links_out, args.keep_null_tmdb)),
+        ("ratings (chunked)", clean_ratings, (p_ratings_in, p_ratings_out, args.ratings_keep)),
+    ]
     if os.path.exists(p_keywords_in):
-        print("[*] Cleaning keywords...")
-        clean_keywords(p_keywords_in, p_keywords_out)
+        stages.append(("keywords", clean_keywords, (p_keywords_in, p_keywords_out)))
         if args.explode_keywords:
-            print("[*] Exploding keywords...")
-            explode_keywords(p_keywords_in, p_keywords_exp)
+            stages.append(("keywords (exploded)", explode_keywords, (p_keywords_in, p_keywords_exp)))
     else:
         print("[*] keywords.csv not found — skipping.")
 
+    # Run; each stage returns its log lines, printed here as it finishes so outputs never interleave
+    print(f"[*] Cleaning {', '.join(name for name, _, _ in stages)} ({args.workers} workers)...")
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(func, *func_args): name for name, func, func_args in stages}
+        for fut in as_completed(futures):
+            log = fut.result()  # re-raise worker errors
+            print("\n".join(log))
+            print(f"[*] Done: {futures[fut]}")
+
     print("[OK] Clean files written to:", args.out_dir)
 
 
@@ -1,50 +1,180 @@
+import io
+import os
+import math
+import re
+import mmap
 import csv
+import sys
 import json
 import argparse
+import queue
+import threading
+import multiprocessing
 from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
 from pathlib import Path
 
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+from bson import encode
+from bson.raw_bson import RawBSONDocument
 from pymongo.errors import BulkWriteError
 from DbConnector import DbConnector
 
+# Fast JSON decoders when the wheels are installed; stdlib json otherwise
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    import simdjson
+    _simd_parser = simdjson.Parser()  # reused across rows
+except ImportError:
+    _simd_parser = None
+
+# Credits fields kept per person (the rest of the TMDB payload is never queried)
+CAST_FIELDS = ("id", "name", "character", "order", "gender")
+CREW_FIELDS = ("id", "name", "job", "department", "gender")
+
+# timestamp stays text: the clean file holds datetimes ("1998-08-22 08:59:47"), older ones epoch seconds
+RATINGS_TYPES = {"userId": pa.int32(), "movieId": pa.int32(), "rating": pa.float64(), "timestamp": pa.string()}
+
+# I/O sizes: 1 MiB file buffer for csv.reader, 8 MiB blocks for pyarrow.csv
+READ_BUFFER = 1 << 20
+CSV_BLOCK_SIZE = 8 << 20
+
+# Cell spellings treated as missing (listed case variants instead of lowering every cell)
+_NULL_SET = frozenset({"", "null", "nan", "NULL", "Null", "NaN", "NAN", "None"})
+_SQ_TABLE = bytes.maketrans(b"'", b'"')  # python-literal quotes -> JSON quotes
+_ISO_DATE_RE = re.compile(r"^\s*(\d{4})([-/])(\d{1,2})\2(\d{1,2})\s*$")  # same separator both times
+# Cells castable to float (Arrow regex); same pattern as filter_movies.NUMERIC_RE, repeated because
+# filter_movies hard-requires orjson/simdjson, which are optional here
+_NUMERIC_RE = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+
 
 # ==================== Parse helpers ====================
 
-def parse_json(value):
-    """Safely parse JSON string. Returns [] on failure."""
+def _cell_bytes(value):
+    """Stripped UTF-8 bytes of a JSON cell, or None when the cell is missing."""
     if value is None:
-        return []
-    s = str(value).strip()
-    if s.lower() in {"", "null", "nan"}:
-        return []
+        return None
+    s = (value if isinstance(value, str) else str(value)).strip()
+    if s in _NULL_SET:
+        return None
+    return s.encode("utf-8")
+
+
+def _decode_json(b: bytes, loads, default):
+    """Decode UTF-8 JSON bytes, retrying with single quotes fixed. Returns `default` on failure."""
     try:
-        return json.loads(s)
+        return loads(b)
     except Exception:
         try:
-            return json.loads(s.replace("'", '"'))
+            return loads(b.translate(_SQ_TABLE))
         except Exception:
-            return []
+            return default
 
 
-def parse_float(value):
+def _parse_json_any(value, default=None):
+    """Parse a JSON cell into whatever it holds (list, dict, scalar). Returns `default`
+    when the cell is missing or unparsable."""
+    b = _cell_bytes(value)
+    return default if b is None else _decode_json(b, _json_loads, default)
+
+
+def parse_json(value):
+    """Safely parse JSON string. Returns [] on failure."""
+    val = _parse_json_any(value)
+    return [] if val is None else val
+
+
+def _plain(v):
+    # simdjson proxies must not outlive their document (the parser is reused on the next row)
+    if isinstance(v, simdjson.Object):
+        return v.as_dict()
+    if isinstance(v, simdjson.Array):
+        return v.as_list()
+    return v
+
+
+def _simd_people(b: bytes, fields):
+    """Lazy simdjson parse: only the persisted keys of each person are materialized."""
+    doc = _simd_parser.parse(b)
+    if not isinstance(doc, simdjson.Array):
+        return _plain(doc)
+    return [{k: _plain(p[k]) for k in fields if k in p} if isinstance(p, simdjson.Object) else _plain(p)
+            for p in doc]
+
+
+def parse_people(value, fields):
+    """Parse a credits cast/crew blob keeping only `fields` per person. Returns [] on failure."""
+    if _simd_parser is None:
+        people = parse_json(value)
+        if not isinstance(people, list):
+            return people
+        return [{k: p[k] for k in fields if k in p} if isinstance(p, dict) else p for p in people]
+    b = _cell_bytes(value)
+    return [] if b is None else _decode_json(b, lambda b: _simd_people(b, fields), [])
+
+
+def intern_fields(items, keys):
+    """sys.intern the string values of `keys` in a list of dicts, in place (low-cardinality
+    labels repeated across millions of rows then share a single str object)."""
+    if isinstance(items, list):
+        for d in items:
+            if isinstance(d, dict):
+                for k in keys:
+                    v = d.get(k)
+                    if type(v) is str:
+                        d[k] = sys.intern(v)
+    return items
+
+
+def _to_float(value):
     try:
         return float(value)
     except Exception:
         return None
 
 
-def parse_int(value):
+def _to_int(value):
     try:
         return int(float(value))
     except Exception:
         return None
 
 
+# CSV cells repeat a lot ("0" budgets/revenues, small vote counts): memoize the str path
+_float_from_str = lru_cache(maxsize=4096)(_to_float)
+_int_from_str = lru_cache(maxsize=4096)(_to_int)
+
+
+def parse_float(value):
+    return _float_from_str(value) if type(value) is str else _to_float(value)
+
+
+def parse_int(value):
+    return _int_from_str(value) if type(value) is str else _to_int(value)
+
+
 def parse_date(value):
     if not value:
         return None
     if isinstance(value, datetime):
         return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    # YYYY-MM-DD / YYYY/MM/DD without strptime's raise-and-catch on misses
+    m = _ISO_DATE_RE.match(value) if isinstance(value, str) else None
+    if m:
+        try:
+            return datetime(int(m[1]), int(m[3]), int(m[4]), tzinfo=timezone.utc)
+        except ValueError:
+            return None  # out-of-range day/month: no other format can match either
     # common formats
     for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y"):
         try:
@@ -54,8 +184,7 @@ def parse_date(value):
             continue
     # ISO
     try:
-        s = str(value).replace("Z", "+00:00")
-        dt = datetime.fromisoformat(s)
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
         return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
     except Exception:
         return None
@@ -80,6 +209,29 @@ def parse_timestamp(value):
         return None
 
 
+def parse_dates(values):
+    """Vectorized parse_date for a list of raw strings: one pd.to_datetime pass for the
+    common YYYY-MM-DD case; only rows it can't parse fall back to parse_date."""
+    parsed = pd.to_datetime(pd.Index(values, dtype=object), format="%Y-%m-%d", errors="coerce", utc=True)
+    out = list(parsed.to_pydatetime())
+    for i in parsed.isna().nonzero()[0]:
+        out[i] = parse_date(values[i])
+    return out
+
+
+def parse_timestamps(arr):
+    """Vectorized parse_timestamp for an Arrow string array (Arrow strptime + cast to UTC);
+    only rows it can't parse (e.g. epoch seconds) fall back to parse_timestamp."""
+    ts = pc.strptime(arr, format="%Y-%m-%d %H:%M:%S", unit="s", error_is_null=True)
+    out = pc.cast(ts, pa.timestamp("s", tz="UTC")).to_pylist()
+    missing = pc.and_(ts.is_null(), arr.is_valid()).to_numpy(zero_copy_only=False).nonzero()[0]
+    if len(missing):
+        raw = arr.to_pylist()
+        for i in missing:
+            out[i] = parse_timestamp(raw[i])
+    return out
+
+
 # ==================== IO helpers ====================
 
 def assert_csv_exists(path, required_fields=None):
@@ -94,12 +246,96 @@ def assert_csv_exists(path, required_fields=None):
                 raise ValueError(f"{path} missing fields: {missing}")
 
 
+def map_file(path, start=0, end=None):
+    """Read-only mmap of bytes [start, end) of a file as a pyarrow BufferReader (no copy into
+    user-space buffers). Hinted MADV_SEQUENTIAL where the platform supports it, so the kernel
+    reads ahead and drops pages behind the parser. Returns None for empty files."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mmap, "MADV_SEQUENTIAL"):
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+    buf = pa.py_buffer(mm)  # the buffer keeps the mapping alive until the reader is done
+    if start or end is not None:
+        buf = buf.slice(start, (len(buf) if end is None else end) - start)
+    return pa.BufferReader(buf)
+
+
+def coerce_column(arr, to_type):
+    """Cast a string column to `to_type`; cells that are not numbers become null (like
+    pd.to_numeric(errors="coerce")). For integer types fractions truncate and values outside
+    the type's range become null; for float types non-finite values from the slow path do."""
+    try:
+        return pc.cast(arr, to_type)  # fast path: every cell already parses as to_type
+    except pa.ArrowInvalid:
+        arr = pc.utf8_trim_whitespace(arr)
+        num = pc.cast(pc.if_else(pc.match_substring_regex(arr, _NUMERIC_RE), arr, None), pa.float64())
+        if pa.types.is_integer(to_type):
+            num = pc.trunc(num)
+            bound = float(1 << (to_type.bit_width - 1))  # signed range [-bound, bound); NaN/inf fail too
+            valid = pc.and_(pc.greater_equal(num, -bound), pc.less(num, bound))
+        else:
+            valid = pc.is_finite(num)
+        return pc.cast(pc.if_else(valid, num, None), to_type)
+
+
+def iter_csv_batches(source, column_types: dict, column_names=None):
+    """Stream a CSV (path, memory-mapped, or binary file) with pyarrow (native, multithreaded
+    parsing) as record batches typed by `column_types` (empty cells -> null). Columns are parsed
+    as strings and cast per batch, so a malformed numeric cell becomes null (row skipped by the
+    caller) instead of aborting the load. Pass `column_names` when the source has no header row."""
+    if isinstance(source, (str, os.PathLike)):
+        source = map_file(source) or source
+    reader = pacsv.open_csv(
+        source,
+        read_options=pacsv.ReadOptions(column_names=column_names, block_size=CSV_BLOCK_SIZE),
+        convert_options=pacsv.ConvertOptions(column_types={name: pa.string() for name in column_types},
+                                             include_columns=list(column_types), strings_can_be_null=True,
+                                             null_values=[""]),  # only empty cells: "nan"/"NA" keywords stay text
+    )
+    for batch in reader:
+        yield pa.RecordBatch.from_arrays(
+            [col if column_types[name] == pa.string() else coerce_column(col, column_types[name])
+             for name, col in zip(batch.schema.names, batch.columns)],
+            names=batch.schema.names)
+
+
+def iter_csv_columns(csv_path, column_types: dict):
+    """iter_csv_batches, each batch as a dict of Python lists."""
+    for batch in iter_csv_batches(csv_path, column_types):
+        yield batch.to_pydict()
+
+
+def iter_csv_rows(csv_path, names):
+    """csv.reader over `csv_path` yielding a tuple of the `names` columns per row. Positions
+    are resolved once from the header; a column missing from the file reads as None. Like
+    csv.DictReader, blank lines are skipped and short rows are padded with None."""
+    with io.TextIOWrapper(open(csv_path, "rb", buffering=READ_BUFFER), encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        pad = [None] * len(header)
+        pick = itemgetter(*[header.index(n) if n in header else -1 for n in names])
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < len(pad):
+                row.extend(pad[len(row):])
+            row.append(None)  # row[-1]: slot for missing columns
+            yield pick(row)
+
+
+def pre_encode(batch):
+    """BSON-encode a batch up front as RawBSONDocument."""
+    return [RawBSONDocument(encode(d)) for d in batch]
+
+
 def safe_insert_many(collection, batch, stats: dict, *, bypass_validation=True):
     """Insert batch tolerating dup keys and partial failures."""
     if not batch:
         return
     try:
-        collection.insert_many(batch, ordered=False)  # ← without bypass_document_validation
+        collection.insert_many(pre_encode(batch), ordered=False)  # ← without bypass_document_validation
         stats["ok"] = stats.get("ok", 0) + len(batch)
     except BulkWriteError as bwe:
         stats["errors"] = stats.get("errors", 0) + 1
@@ -112,250 +348,340 @@ def safe_insert_many(collection, batch, stats: dict, *, bypass_validation=True):
         batch.clear()
 
 
-def progress_print(n, step=1_000_000, label="progress"):
-    if n and n % step == 0:
-        print(f"[{label}] processed: {n:,}")
+PROGRESS_STEP = 1_000_000
 
 
-# ==================== Inserters ====================
+def progress_print(n, next_report, step=PROGRESS_STEP, label="progress"):
+    """Report once `n` reaches `next_report`; returns the next threshold. Callers compare
+    `n >= next_report` inline so the per-row cost is one int compare (no modulo, no call)."""
+    if n < next_report:
+        return next_report
+    print(f"[{label}] processed: {n:,}")
+    return (n // step + 1) * step
 
-def insert_movies(collection, csv_path, *, batch_size=5000, max_runtime=873):
-    """Insert cleaned movies with defensive checks."""
-    print(f"[movies] inserting from {csv_path}")
-    batch, stats, total_rows = [], {}, 0
 
-    def flush():
+# ==================== Inserters ====================
+
+def _drive(docs, collection, batch_size, stats: dict, *, prepare=None):
+    """Insert documents from an iterator in fresh islice-sized batches.
+    `prepare(batch)` runs on each batch before insertion (per-batch vectorized fixes)."""
+    while batch := list(islice(docs, batch_size)):
+        if prepare is not None:
+            prepare(batch)
         safe_insert_many(collection, batch, stats)
 
-    try:
-        with open(csv_path, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                total_rows += 1
-                movie_id = parse_int(row.get("id"))
-                if movie_id is None or movie_id < 0:
-                    continue
 
-                # runtime defensive filter (max 873, allow None)
-                runtime = parse_float(row.get("runtime"))
-                if runtime is not None and runtime > max_runtime:
-                    continue
-                if runtime is not None and runtime < 0:
-                    runtime = None
-
-                # belongs_to_collection (dict or None)
-                belongs_raw = row.get("belongs_to_collection")
-                belongs = None
-                if belongs_raw and str(belongs_raw).strip().lower() not in {"", "null", "nan"}:
-                    try:
-                        tmp = json.loads(belongs_raw)
-                    except Exception:
-                        try:
-                            tmp = json.loads(str(belongs_raw).replace("'", '"'))
-                        except Exception:
-                            tmp = None
-                    belongs = tmp if isinstance(tmp, dict) else None
-
-                document = {
-                    "_id": movie_id,
-                    "id": movie_id,
-                    "title": row.get("title"),
-                    "original_title": row.get("original_title"),
-                    "overview": row.get("overview"),
-                    "tagline": row.get("tagline"),
-                    "release_date": parse_date(row.get("release_date")),
-                    "runtime": runtime,
-                    "budget": parse_float(row.get("budget")),
-                    "revenue": parse_float(row.get("revenue")),
-                    "vote_average": parse_float(row.get("vote_average")),
-                    "vote_count": parse_int(row.get("vote_count")),
-                    "genres": parse_json(row.get("genres")),
-                    "production_companies": parse_json(row.get("production_companies")),
-                    "production_countries": parse_json(row.get("production_countries")),
-                    "spoken_languages": parse_json(row.get("spoken_languages")),
-                    "belongs_to_collection": belongs,
-                    "original_language": row.get("original_language"),
-                }
-                batch.append(document)
-
-                if len(batch) >= batch_size:
-                    flush()
-                progress_print(total_rows, label="movies")
+def _drive_threaded(docs, collection, batch_size, stats: dict, *, writers=4, prepare=None):
+    """_drive with `writers` insert threads fed through a bounded queue: building the next
+    batches overlaps with the server acknowledging the previous insert_many calls."""
+    pending = queue.Queue(maxsize=writers)
+    parts = [{} for _ in range(writers)]  # per-thread stats, merged at the end
+    errors = []
+
+    def consume(part):
+        while (batch := pending.get()) is not None:
+            if errors:
+                continue  # keep draining so the producer never blocks on a dead consumer
+            try:
+                safe_insert_many(collection, batch, part)
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=consume, args=(part,), daemon=True) for part in parts]
+    for t in threads:
+        t.start()
+    try:
+        while not errors and (batch := list(islice(docs, batch_size))):
+            if prepare is not None:
+                prepare(batch)
+            pending.put(batch)
     finally:
-        flush()
+        for _ in threads:
+            pending.put(None)
+        for t in threads:
+            t.join()
+        for part in parts:
+            for k, v in part.items():
+                stats[k] = stats.get(k, 0) + v
+    if errors:
+        raise errors[0]
+
+
+MOVIE_COLUMNS = ("id", "title", "original_title", "overview", "tagline", "release_date", "runtime", "budget",
+                 "revenue", "vote_average", "vote_count", "genres", "production_companies", "production_countries",
+                 "spoken_languages", "belongs_to_collection", "original_language")
+
+
+def _movie_docs(csv_path, max_runtime):
+    """Yield movie documents (release_date still raw, see _parse_release_dates)."""
+    next_report = PROGRESS_STEP
+    for total_rows, row in enumerate(iter_csv_rows(csv_path, MOVIE_COLUMNS), 1):
+        if total_rows >= next_report:
+            next_report = progress_print(total_rows, next_report, label="movies")
+        (raw_id, title, original_title, overview, tagline, release_date, raw_runtime, budget, revenue,
+         vote_average, vote_count, genres, companies, countries, languages, belongs, language) = row
+        movie_id = parse_int(raw_id)
+        if movie_id is None or movie_id < 0:
+            continue
+
+        # runtime defensive filter (max 873, allow None)
+        runtime = parse_float(raw_runtime)
+        if runtime is not None and runtime > max_runtime:
+            continue
+        if runtime is not None and runtime < 0:
+            runtime = None
+
+        belongs = _parse_json_any(belongs)
+        yield {
+            "_id": movie_id,
+            "id": movie_id,
+            "title": title,
+            "original_title": original_title,
+            "overview": overview,
+            "tagline": tagline,
+            "release_date": release_date,
+            "runtime": runtime,
+            "budget": parse_float(budget),
+            "revenue": parse_float(revenue),
+            "vote_average": parse_float(vote_average),
+            "vote_count": parse_int(vote_count),
+            "genres": intern_fields(parse_json(genres), ("name",)),
+            "production_companies": parse_json(companies),
+            "production_countries": intern_fields(parse_json(countries), ("iso_3166_1", "name")),
+            "spoken_languages": intern_fields(parse_json(languages), ("iso_639_1", "name")),
+            "belongs_to_collection": belongs if isinstance(belongs, dict) else None,
+            "original_language": sys.intern(language) if language else language,
+        }
+
+
+def _parse_release_dates(batch):
+    for doc, release_date in zip(batch, parse_dates([doc["release_date"] for doc in batch])):
+        doc["release_date"] = release_date
+
+
+def insert_movies(collection, csv_path, *, batch_size=5000, max_runtime=873):
+    """Insert cleaned movies with defensive checks."""
+    print(f"[movies] inserting from {csv_path}")
+    stats = {}
+    _drive(_movie_docs(csv_path, max_runtime), collection, batch_size, stats, prepare=_parse_release_dates)
 
-    total_coll = collection.count_documents({})
+    total_coll = collection.estimated_document_count()
     print(f"[movies] ok={stats.get('ok',0):,} dup={stats.get('dupkey',0):,} errors={stats.get('errors',0)} | total in collection: {total_coll:,}")
 
 
+def _keyword_docs(csv_path):
+    next_report = PROGRESS_STEP
+    for total, (raw_id, keywords) in enumerate(iter_csv_rows(csv_path, ("id", "keywords")), 1):
+        if total >= next_report:
+            next_report = progress_print(total, next_report, label="keywords")
+        movie_id = parse_int(raw_id)
+        if movie_id is None:
+            continue
+        kw_list = parse_json(keywords)
+        yield {"_id": movie_id, "movie_id": movie_id, "keywords": kw_list}
+
+
 def insert_keywords(collection, csv_path):
     """Insert keywords_clean.csv (una fila por película con lista de keywords)."""
     print(f"[keywords] inserting from {csv_path}")
-    batch, stats, total = [], {}, 0
+    stats = {}
+    _drive(_keyword_docs(csv_path), collection, 5000, stats)
 
-    def flush():
-        safe_insert_many(collection, batch, stats)
-
-    try:
-        with open(csv_path, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                total += 1
-                movie_id = parse_int(row.get("id"))
-                if movie_id is None:
-                    continue
-                kw_list = parse_json(row.get("keywords"))
-                document = {"_id": movie_id, "movie_id": movie_id, "keywords": kw_list}
-                batch.append(document)
-                if len(batch) >= 5000:
-                    flush()
-                progress_print(total, label="keywords")
-    finally:
-        flush()
-
-    total_coll = collection.count_documents({})
+    total_coll = collection.estimated_document_count()
     print(f"[keywords] ok={stats.get('ok',0):,} | total in collection: {total_coll:,}")
 
 
+def _keyword_exploded_docs(csv_path):
+    total, next_report = 0, PROGRESS_STEP
+    for cols in iter_csv_columns(csv_path, {"movie_id": pa.int64(), "keyword": pa.string()}):
+        total += len(cols["movie_id"])
+        next_report = progress_print(total, next_report, label="keywords_exploded")
+        for movie_id, keyword in zip(cols["movie_id"], cols["keyword"]):
+            if not movie_id or not keyword:
+                continue
+            yield {"movie_id": movie_id, "keyword": sys.intern(keyword.strip().lower())}
+
 
 def insert_keywords_exploded(collection, csv_path):
     """Insert keywords_exploded.csv (una fila por keyword–película)."""
     print(f"[keywords_exploded] inserting from {csv_path}")
-    batch, stats, total = [], {}, 0
+    stats = {}
+    _drive(_keyword_exploded_docs(csv_path), collection, 5000, stats)
 
-    def flush():
-        safe_insert_many(collection, batch, stats)
-
-    try:
-        with open(csv_path, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                total += 1
-                movie_id = parse_int(row.get("movie_id"))
-                keyword = row.get("keyword")
-                if not movie_id or not keyword:
-                    continue
-                doc = {"movie_id": movie_id, "keyword": keyword.strip().lower()}
-                batch.append(doc)
-                if len(batch) >= 5000:
-                    flush()
-                progress_print(total, label="keywords_exploded")
-    finally:
-        flush()
-
-    total_coll = collection.count_documents({})
+    total_coll = collection.estimated_document_count()
     print(f"[keywords_exploded] ok={stats.get('ok',0):,} | total in collection: {total_coll:,}")
 
 
+def _credit_docs(csv_path):
+    next_report = PROGRESS_STEP
+    rows = iter_csv_rows(csv_path, ("id", "movie_id", "cast", "crew"))
+    for total_rows, (raw_id, raw_movie_id, cast, crew) in enumerate(rows, 1):
+        if total_rows >= next_report:
+            next_report = progress_print(total_rows, next_report, label="credits")
+        movie_id = parse_int(raw_id or raw_movie_id)
+        if movie_id is None:
+            continue
+        yield {
+            "_id": movie_id,
+            "movie_id": movie_id,
+            "cast": parse_people(cast, CAST_FIELDS),
+            "crew": intern_fields(parse_people(crew, CREW_FIELDS), ("job", "department")),
+        }
+
 
 def insert_credits(collection, csv_path, *, batch_size=5000):
     print(f"[credits] inserting from {csv_path}")
-    batch, stats, total_rows = [], {}, 0
+    stats = {}
+    _drive(_credit_docs(csv_path), collection, batch_size, stats)
 
-    def flush():
-        safe_insert_many(collection, batch, stats)
+    total_coll = collection.estimated_document_count()
+    print(f"[credits] ok={stats.get('ok',0):,} dup={stats.get('dupkey',0):,} errors={stats.get('errors',0)} | total in collection: {total_coll:,}")
 
-    try:
-        with open(csv_path, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                total_rows += 1
-                movie_id = parse_int(row.get("id") or row.get("movie_id"))
-                if movie_id is None:
+
+def _link_docs(csv_path, require_tmdb):
+    # tmdbId as float64: older clean files wrote it as "862.0"
+    types = {"movieId": pa.int64(), "imdbId": pa.int64(), "tmdbId": pa.float64()}
+    total_rows, next_report = 0, PROGRESS_STEP
+    for cols in iter_csv_columns(csv_path, types):
+        total_rows += len(cols["movieId"])
+        next_report = progress_print(total_rows, next_report, label="links")
+        for movie_id, imdb_id, tmdb_id in zip(cols["movieId"], cols["imdbId"], cols["tmdbId"]):
+            if movie_id is None or imdb_id is None:
+                continue
+            if tmdb_id is not None:
+                if not math.isfinite(tmdb_id):  # "inf" / "1e400" pass the float cast
                     continue
-                document = {
-                    "_id": movie_id,
-                    "movie_id": movie_id,
-                    "cast": parse_json(row.get("cast")),
-                    "crew": parse_json(row.get("crew")),
-                }
-                batch.append(document)
-                if len(batch) >= batch_size:
-                    flush()
-                progress_print(total_rows, label="credits")
-    finally:
-        flush()
+                tmdb_id = int(tmdb_id)
+            elif require_tmdb:
+                continue
 
-    total_coll = collection.count_documents({})
-    print(f"[credits] ok={stats.get('ok',0):,} dup={stats.get('dupkey',0):,} errors={stats.get('errors',0)} | total in collection: {total_coll:,}")
+            yield {
+                "_id": movie_id,  # primary key = MovieLens movieId
+                "movieId": movie_id,
+                "imdbId": imdb_id,
+                "tmdbId": tmdb_id,
+            }
 
 
 def insert_links(collection, csv_path, *, batch_size=10000, require_tmdb=True):
     """Insert MovieLens links: movieId -> imdbId, tmdbId. If require_tmdb=False, allow null tmdbId rows to be skipped gracefully."""
     print(f"[links] inserting from {csv_path}")
-    batch, stats, total_rows = [], {}, 0
+    stats = {}
+    _drive(_link_docs(csv_path, require_tmdb), collection, batch_size, stats)
 
-    def flush():
-        safe_insert_many(collection, batch, stats)
+    total_coll = collection.estimated_document_count()
+    print(f"[links] ok={stats.get('ok',0):,} dup={stats.get('dupkey',0):,} errors={stats.get('errors',0)} | total in collection: {total_coll:,}")
 
-    try:
-        with open(csv_path, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                total_rows += 1
-                movie_id = parse_int(row.get("movieId"))
-                imdb_id = parse_int(row.get("imdbId"))
-                tmdb_id = parse_int(row.get("tmdbId"))
-                if movie_id is None or imdb_id is None:
-                    continue
-                if require_tmdb and tmdb_id is None:
-                    continue
 
-                document = {
-                    "_id": movie_id,  # primary key = MovieLens movieId
-                    "movieId": movie_id,
-                    "imdbId": imdb_id,
-                    "tmdbId": tmdb_id,
-                }
-                batch.append(document)
-                if len(batch) >= batch_size:
-                    flush()
-                progress_print(total_rows, label="links")
+def build_rating_docs(user_ids, movie_ids, ratings, timestamps):
+    """Ratings documents for already-validated columns, built in one comprehension."""
+    return [{"userId": u, "movieId": m, "rating": r, "timestamp": t}
+            for u, m, r, t in zip(user_ids, movie_ids, ratings, timestamps)]
+
+
+def _rating_docs(batches, require_timestamp=False):
+    """Yield ratings documents from Arrow record batches (require_timestamp drops rows whose
+    timestamp is missing/unparsable: time-series collections reject them)."""
+    total_rows, next_report = 0, PROGRESS_STEP
+    for rb in batches:
+        total_rows += rb.num_rows
+        next_report = progress_print(total_rows, next_report, label="ratings")
+        # one vectorized validity mask instead of per-row checks (null rating -> NaN fails both bounds)
+        rating = rb.column("rating").to_numpy(zero_copy_only=False)
+        keep = (rating >= 0) & (rating <= 10)
+        keep &= rb.column("userId").is_valid().to_numpy(zero_copy_only=False)
+        keep &= rb.column("movieId").is_valid().to_numpy(zero_copy_only=False)
+        if not keep.all():
+            rb = rb.filter(pa.array(keep))
+
+        docs = build_rating_docs(rb.column("userId").to_pylist(), rb.column("movieId").to_pylist(),
+                                 rb.column("rating").to_pylist(), parse_timestamps(rb.column("timestamp")))
+        if require_timestamp:
+            docs = [d for d in docs if d["timestamp"] is not None]
+        yield from docs
+
+
+def split_csv_ranges(csv_path, n):
+    """Split a CSV's data rows into n byte ranges [start, end) aligned on line starts.
+    Returns (header column names, ranges). Assumes no newlines inside quoted values."""
+    size = os.path.getsize(csv_path)
+    with open(csv_path, "rb") as f:
+        columns = next(csv.reader([f.readline().decode("utf-8")]))
+        data_start = f.tell()
+        bounds = [data_start]
+        for k in range(1, n):
+            # step back one byte so a cut landing exactly on a line start keeps that line
+            f.seek(max(data_start + (size - data_start) * k // n, bounds[-1]) - 1)
+            f.readline()
+            bounds.append(min(f.tell(), size))
+        bounds.append(size)
+    return columns, [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def _drive_ratings(docs, collection, batch_size, stats: dict, writers):
+    """_drive, or _drive_threaded when `writers` > 1."""
+    if writers > 1:
+        _drive_threaded(docs, collection, batch_size, stats, writers=writers)
+    else:
+        _drive(docs, collection, batch_size, stats)
+
+
+def _insert_ratings_range(task):
+    """Pool worker: insert one byte range of the ratings CSV over its own connection."""
+    csv_path, columns, start, end, db_name, coll_name, batch_size, writers, timeseries = task
+    connector = DbConnector(DATABASE=db_name)  # MongoClient is not fork-safe: one per process
+    stats = {}
+    try:
+        batches = iter_csv_batches(map_file(csv_path, start, end), RATINGS_TYPES, column_names=columns)
+        _drive_ratings(_rating_docs(batches, timeseries), connector.db[coll_name], batch_size, stats, writers)
     finally:
-        flush()
-
-    total_coll = collection.count_documents({})
-    print(f"[links] ok={stats.get('ok',0):,} dup={stats.get('dupkey',0):,} errors={stats.get('errors',0)} | total in collection: {total_coll:,}")
+        connector.close_connection()
+    return stats
 
 
-def insert_ratings(collection, csv_path, *, batch_size=100_000):
-    """Insert ratings (FULL, chunk-friendly through CSV streaming)."""
+def insert_ratings(collection, csv_path, *, batch_size=100_000, workers=1, writers=1):
+    """Insert ratings (FULL, chunk-friendly through CSV streaming).
+    writers > 1 keeps that many insert_many calls in flight from threads while the CSV is read.
+    workers > 1 splits the file by byte ranges, each range loaded by its own process
+    and MongoClient (with `writers` insert threads each)."""
     print(f"[ratings] inserting from {csv_path}")
-    batch, stats, total_rows = [], {}, 0
-
-    def flush():
-        safe_insert_many(collection, batch, stats)
-
-    try:
-        with open(csv_path, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                total_rows += 1
-                user_id = parse_int(row.get("userId"))
-                movie_id = parse_int(row.get("movieId"))
-                rating = parse_float(row.get("rating"))
-                if user_id is None or movie_id is None or rating is None:
-                    continue
-                if not (0 <= rating <= 10):
-                    continue
+    timeseries = "timeseries" in collection.options()
+    # drop secondary indexes (keeps _id_) so rows don't update four b-trees each; rebuilt in bulk below.
+    # Time-series collections keep theirs: the server-created {userId, timestamp} index would go too.
+    if not timeseries:
+        collection.drop_indexes()
+    stats = {}
+    if workers > 1:
+        columns, ranges = split_csv_ranges(csv_path, workers)
+        db_name, coll_name = collection.database.name, collection.name
+        tasks = [(csv_path, columns, a, b, db_name, coll_name, batch_size, writers, timeseries) for a, b in ranges]
+        if tasks:  # a header-only file yields no ranges (and Pool(0) raises)
+            with multiprocessing.Pool(len(tasks)) as pool:
+                for part in pool.imap_unordered(_insert_ratings_range, tasks):
+                    for k, v in part.items():
+                        stats[k] = stats.get(k, 0) + v
+    else:
+        docs = _rating_docs(iter_csv_batches(csv_path, RATINGS_TYPES), timeseries)
+        _drive_ratings(docs, collection, batch_size, stats, writers)
+
+    print("[ratings] rebuilding indexes...")
+    ensure_ratings_indexes(collection.database)
+
+    total_coll = collection.estimated_document_count()
+    print(f"[ratings] ok={stats.get('ok',0):,} dup={stats.get('dupkey',0):,} errors={stats.get('errors',0)} | total in collection: {total_coll:,}")
 
-                timestamp = parse_timestamp(row.get("timestamp"))
-                document = {
-                    "userId": user_id,
-                    "movieId": movie_id,
-                    "rating": rating,
-                    "timestamp": timestamp,
-                }
-                batch.append(document)
-
-                if len(batch) >= batch_size:
-                    flush()
-                progress_print(total_rows, label="ratings")
-    finally:
-        flush()
 
-    total_coll = collection.count_documents({})
-    print(f"[ratings] ok={stats.get('ok',0):,} dup={stats.get('dupkey',0):,} errors={stats.get('errors',0)} | total in collection: {total_coll:,}")
+def create_ratings_timeseries(db, granularity="hours"):
+    """Create `ratings` as a time-series collection (timeField=timestamp, metaField=userId) so
+    MongoDB buckets each user's ratings instead of storing one document per row. Documents
+    keep their regular shape, so the ratings queries are unchanged. No-op if it exists."""
+    if "ratings" in db.list_collection_names():
+        if "timeseries" not in db.ratings.options():
+            print("[ratings] existing collection is not time-series (use --reset to recreate it)")
+        return
+    db.create_collection("ratings", timeseries={"timeField": "timestamp", "metaField": "userId",
+                                                "granularity": granularity})
+    print("[ratings] created time-series collection")
 
 
 # ==================== Indexes ====================
@@ -383,13 +709,18 @@ def ensure_indexes(db):
     db.links.create_index([("tmdbId", 1)], name="tmdbId_idx")
 
     # Ratings
+    ensure_ratings_indexes(db)
+
+    print("[indexes] done.")
+
+
+def ensure_ratings_indexes(db):
+    """Ratings secondary indexes (built in bulk once the collection is loaded)."""
     db.ratings.create_index([("movieId", 1)], name="ratings_movie_idx")
     db.ratings.create_index([("userId", 1)], name="ratings_user_idx")
     db.ratings.create_index([("movieId", 1), ("userId", 1)], name="ratings_movie_user_idx")
     db.ratings.create_index([("timestamp", 1)], name="ratings_time_idx")
 
-    print("[indexes] done.")
-
 
 # ==================== Main ====================
 
@@ -401,6 +732,9 @@ def main():
     parser.add_argument("--batch-credits", type=int, default=5000)
     parser.add_argument("--batch-links", type=int, default=10000)
     parser.add_argument("--batch-ratings", type=int, default=100000)
+    parser.add_argument("--ratings-workers", type=int, default=1, help="Processes loading byte ranges of ratings in parallel (own connection each)")
+    parser.add_argument("--ratings-timeseries", action="store_true", help="Create ratings as a time-series collection (timeField=timestamp, metaField=userId)")
+    parser.add_argument("--ratings-writers", type=int, default=4, help="Concurrent insert_many threads for ratings, per --ratings-workers process (1 = serial)")
     parser.add_argument("--allow-null-tmdb", action="store_true", help="Allow links rows without tmdbId (they will be inserted with tmdbId=None)")
     parser.add_argument("--max-runtime", type=int, default=873, help="Max allowed runtime in minutes (default: 873)")
     args = parser.parse_args()
@@ -428,11 +762,15 @@ def main():
             if name in db.list_collection_names():
                 db[name].drop()
 
+    if args.ratings_timeseries:
+        create_ratings_timeseries(db)
+
     # Insert
     insert_movies(db.movies, str(movies_path), batch_size=args.batch_movies, max_runtime=args.max_runtime)
     insert_credits(db.credits, str(credits_path), batch_size=args.batch_credits)
     insert_links(db.links, str(links_path), batch_size=args.batch_links, require_tmdb=not args.allow_null_tmdb)
-    insert_ratings(db.ratings, str(ratings_path), batch_size=args.batch_ratings)
+    insert_ratings(db.ratings, str(ratings_path), batch_size=args.batch_ratings,
+                   workers=args.ratings_workers, writers=args.ratings_writers)
     insert_keywords(db.keywords, str(keywords_clean_path))
     insert_keywords_exploded(db.keywords_exploded, str(keywords_exp_path))
 